@@ -198,7 +198,9 @@ version = '0.13.5'
 import re as _re
 import itertools as _itertools
 import collections as _collections
-from threading import Thread as _Thread, Lock as _Lock
+import heapq as _heapq
+import traceback as _traceback
+from threading import Thread as _Thread, Lock as _Lock, Condition as _Condition
 import time as _time
 # Python2... Buggy on time changes and leap seconds, but no other good option (https://stackoverflow.com/questions/1205722/how-do-i-get-monotonic-time-durations-in-python).
 _time.monotonic = getattr(_time, 'monotonic', None) or _time.time
@@ -247,9 +249,14 @@ else:
 
 from ._keyboard_event import KEY_DOWN, KEY_UP, KeyboardEvent
 from ._generic import GenericListener as _GenericListener
-from ._canonical_names import all_modifiers, sided_modifiers, normalize_name
+from ._canonical_names import all_modifiers, sided_modifiers, normalize_name, _max_cache_size
 
 _modifier_scan_codes = set()
+def _load_modifier_scan_codes():
+    if not _modifier_scan_codes:
+        scan_codes = (key_to_scan_codes(name, False) for name in all_modifiers) 
+        _modifier_scan_codes.update(*scan_codes)
+
 def is_modifier(key):
     """
     Returns True if `key` is a scan code or name of a modifier key.
@@ -257,15 +264,49 @@ def is_modifier(key):
     if _is_str(key):
         return key in all_modifiers
     else:
-        if not _modifier_scan_codes:
-            scan_codes = (key_to_scan_codes(name, False) for name in all_modifiers) 
-            _modifier_scan_codes.update(*scan_codes)
+        _load_modifier_scan_codes()
         return key in _modifier_scan_codes
 
 _pressed_events_lock = _Lock()
 _pressed_events = {}
+# Names of the keys in `_pressed_events`, updated as keys are pressed and
+# released, so `get_hotkey_name` and `read_hotkey` don't have to rebuild it.
+_pressed_names = []
+# Sorted scan codes of `_pressed_events`, the key used to look up hotkeys. Only
+# rebuilt when a key is pressed or released, not for every event (e.g. repeats).
+_pressed_scan_codes = ()
 _physically_pressed_keys = _pressed_events
 _logically_pressed_keys = {}
+
+# Small ints used to index the flattened `_KeyboardListener.transition_table`.
+_modifier_state_ids = {'free': 0, 'pending': 1, 'suppressed': 2, 'allowed': 3}
+_event_type_ids = {KEY_DOWN: 0, KEY_UP: 1}
+_origin_ids = {'modifier': 0, 'hotkey': 1, 'other': 2}
+def _flatten_transition_table(table):
+    """
+    Converts a transition table keyed by (state, event_type, origin) into a
+    tuple indexed by `state_id * 6 + event_type_id * 3 + origin_id`, with the
+    next state also given as an id.
+    """
+    flat = [None] * (len(_modifier_state_ids) * len(_event_type_ids) * len(_origin_ids))
+    for (state, event_type, origin), (should_press, accept, next_state) in table.items():
+        index = _modifier_state_ids[state] * 6 + _event_type_ids[event_type] * 3 + _origin_ids[origin]
+        flat[index] = (should_press, accept, _modifier_state_ids[next_state])
+    return tuple(flat)
+
+class _TypedHandler(object):
+    """
+    Handler that only receives events of `event_type`. A new one is created
+    for every registration, so it's always hashable and removing it never
+    affects other registrations of the same callback.
+    """
+    def __init__(self, callback, event_type):
+        self.callback = callback
+        self.event_type = event_type
+
+    def __call__(self, event):
+        return self.callback(event)
+
 class _KeyboardListener(_GenericListener):
     transition_table = {
         #Current state of the modifier, per `modifier_states`.
@@ -309,14 +350,55 @@ class _KeyboardListener(_GenericListener):
         ('allowed',    KEY_UP,   'other'):    (False, True,  'allowed'),
         ('allowed',    KEY_DOWN, 'other'):    (False, True,  'allowed'),
     }
+    # Avoids hashing a tuple of strings for every modifier on every event.
+    flat_transition_table = _flatten_transition_table(transition_table)
+
+    def __init__(self):
+        super(_KeyboardListener, self).__init__()
+        # Handlers split by the event type they receive, so `on_press` and
+        # `on_release` handlers aren't called just to compare the event type.
+        # Updated in place, like `handlers`, so handlers added or removed while
+        # an event is dispatched take effect immediately.
+        self.handlers_by_type = {KEY_DOWN: [], KEY_UP: []}
+
+    def add_handler(self, handler):
+        """
+        Adds a function to receive each event captured. `_TypedHandler`s only
+        receive the events of their type.
+        """
+        super(_KeyboardListener, self).add_handler(handler)
+        typed = isinstance(handler, _TypedHandler)
+        for event_type, handlers in self.handlers_by_type.items():
+            if not typed or handler.event_type == event_type:
+                handlers.append(handler)
+
+    def remove_handler(self, handler):
+        super(_KeyboardListener, self).remove_handler(handler)
+        for handlers in self.handlers_by_type.values():
+            while handler in handlers:
+                handlers.remove(handler)
+
+    def remove_all_handlers(self):
+        del self.handlers[:]
+        for handlers in self.handlers_by_type.values():
+            del handlers[:]
+
+    def get_handlers(self, event):
+        return self.handlers_by_type[event.event_type]
 
     def init(self):
         _os_keyboard.init()
+        # Loaded up front so `direct_callback` can test scan codes against the
+        # set directly.
+        _load_modifier_scan_codes()
 
         self.active_modifiers = set()
+        # Same as `active_modifiers`, but sorted and only rebuilt when a
+        # modifier is pressed or released, not for every event.
+        self.sorted_active_modifiers = ()
         self.blocking_hooks = []
-        self.blocking_keys = _collections.defaultdict(list)
-        self.nonblocking_keys = _collections.defaultdict(list)
+        self.blocking_keys = _collections.defaultdict(list) # (scan code, event type) -> hooks
+        self.nonblocking_keys = _collections.defaultdict(list) # (scan code, event type) -> hooks
         self.blocking_hotkeys = _collections.defaultdict(list)
         self.nonblocking_hotkeys = _collections.defaultdict(list)
         self.filtered_modifiers = _collections.Counter()
@@ -324,15 +406,15 @@ class _KeyboardListener(_GenericListener):
 
         # Supporting hotkey suppression is harder than it looks. See
         # https://github.com/boppreh/keyboard/issues/22
-        self.modifier_states = {} # "alt" -> "allowed"
+        self.modifier_states = {} # scan code -> _modifier_state_ids[state], missing is "free"
 
     def pre_process_event(self, event):
-        for key_hook in self.nonblocking_keys[event.scan_code]:
+        # Plain dict.get, indexing the defaultdicts would insert an empty list
+        # for every key and hotkey that has nothing registered.
+        for key_hook in self.nonblocking_keys.get((event.scan_code, event.event_type), ()):
             key_hook(event)
 
-        with _pressed_events_lock:
-            hotkey = tuple(sorted(_pressed_events))
-        for callback in self.nonblocking_hotkeys[hotkey]:
+        for callback in self.nonblocking_hotkeys.get(_pressed_scan_codes, ()):
             callback(event)
 
         return event.scan_code or (event.name and event.name != 'unknown')
@@ -351,57 +433,86 @@ class _KeyboardListener(_GenericListener):
         if self.is_replaying:
             return True
 
-        if not all(hook(event) for hook in self.blocking_hooks):
-            return False
+        # Plain loop, `all()` over a generator would allocate one for every
+        # event.
+        for hook in self.blocking_hooks:
+            if not hook(event):
+                return False
 
         event_type = event.event_type
         scan_code = event.scan_code
+        active_modifiers = self.active_modifiers
+        blocking_hotkeys = self.blocking_hotkeys
 
         # Update tables of currently pressed keys and modifiers.
+        global _pressed_scan_codes
         with _pressed_events_lock:
             if event_type == KEY_DOWN:
-                if is_modifier(scan_code): self.active_modifiers.add(scan_code)
+                if scan_code not in active_modifiers and scan_code in _modifier_scan_codes:
+                    active_modifiers.add(scan_code)
+                    self.sorted_active_modifiers = tuple(sorted(active_modifiers))
+                previous = _pressed_events.get(scan_code)
+                if previous is None or previous.name != event.name:
+                    # Key repeats may be reported with a different name
+                    # (e.g. "a" then "A" after shift is pressed).
+                    if previous is not None and previous.name: _pressed_names.remove(previous.name)
+                    if event.name: _pressed_names.append(event.name)
                 _pressed_events[scan_code] = event
-            hotkey = tuple(sorted(_pressed_events))
+                if previous is None:
+                    _pressed_scan_codes = tuple(sorted(_pressed_events))
+            hotkey = _pressed_scan_codes
             if event_type == KEY_UP:
-                self.active_modifiers.discard(scan_code)
-                if scan_code in _pressed_events: del _pressed_events[scan_code]
-
-        # Mappings based on individual keys instead of hotkeys.
-        for key_hook in self.blocking_keys[scan_code]:
-            if not key_hook(event):
-                return False
+                if scan_code in active_modifiers:
+                    active_modifiers.discard(scan_code)
+                    self.sorted_active_modifiers = tuple(sorted(active_modifiers))
+                if scan_code in _pressed_events:
+                    name = _pressed_events.pop(scan_code).name
+                    if name: _pressed_names.remove(name)
+                    _pressed_scan_codes = tuple(sorted(_pressed_events))
+
+        # Mappings based on individual keys instead of hotkeys. Most programs
+        # don't suppress anything, so this and the hotkey state machine below
+        # are skipped entirely when nothing is registered.
+        if self.blocking_keys:
+            for key_hook in self.blocking_keys.get((scan_code, event_type), ()):
+                if not key_hook(event):
+                    return False
 
         # Default accept.
         accept = True
 
-        if self.blocking_hotkeys:
-            if self.filtered_modifiers[scan_code]:
+        if blocking_hotkeys:
+            modifier_states = self.modifier_states
+            transition_table = self.flat_transition_table
+            # Plain dict.get, Counter.__getitem__ goes through __missing__
+            # for the keys that aren't filtered, i.e. most of them.
+            if self.filtered_modifiers.get(scan_code):
                 origin = 'modifier'
-                modifiers_to_update = set([scan_code])
+                modifiers_to_update = (scan_code,)
             else:
-                modifiers_to_update = self.active_modifiers
-                if is_modifier(scan_code):
-                    modifiers_to_update = modifiers_to_update | {scan_code}
-                callback_results = [callback(event) for callback in self.blocking_hotkeys[hotkey]]
+                modifiers_to_update = self.sorted_active_modifiers
+                if scan_code not in active_modifiers and scan_code in _modifier_scan_codes:
+                    # Modifier was just released, but still needs updating.
+                    modifiers_to_update = tuple(sorted(modifiers_to_update + (scan_code,)))
+                callback_results = [callback(event) for callback in blocking_hotkeys.get(hotkey, ())]
                 if callback_results:
                     accept = all(callback_results)
                     origin = 'hotkey'
                 else:
                     origin = 'other'
 
-            for key in sorted(modifiers_to_update):
-                transition_tuple = (self.modifier_states.get(key, 'free'), event_type, origin)
-                should_press, new_accept, new_state = self.transition_table[transition_tuple]
+            offset = _event_type_ids[event_type] * 3 + _origin_ids[origin]
+            for key in modifiers_to_update:
+                should_press, new_accept, new_state = transition_table[modifier_states.get(key, 0) * 6 + offset]
                 if should_press: press(key)
                 if new_accept is not None: accept = new_accept
-                self.modifier_states[key] = new_state
+                modifier_states[key] = new_state
 
         if accept:
             if event_type == KEY_DOWN:
                 _logically_pressed_keys[scan_code] = event
-            elif event_type == KEY_UP and scan_code in _logically_pressed_keys:
-                del _logically_pressed_keys[scan_code]
+            elif event_type == KEY_UP:
+                _logically_pressed_keys.pop(scan_code, None)
 
         # Queue for handlers that won't block the event.
         self.queue.put(event)
@@ -413,6 +524,7 @@ class _KeyboardListener(_GenericListener):
 
 _listener = _KeyboardListener()
 
+_key_scan_codes = {}
 def key_to_scan_codes(key, error_if_missing=True):
     """
     Returns a list of scan codes associated with this key (name or scan code).
@@ -424,11 +536,22 @@ def key_to_scan_codes(key, error_if_missing=True):
     elif not _is_str(key):
         raise ValueError('Unexpected key type ' + str(type(key)) + ', value (' + repr(key) + ')')
 
+    # The same names are resolved over and over (hotkeys, `send`, `is_pressed`)
+    # and the OS key tables don't change. Missing keys are not cached, so they
+    # still raise the full error.
+    try:
+        return _key_scan_codes[key]
+    except KeyError:
+        pass
+
     normalized = normalize_name(key)
     if normalized in sided_modifiers:
         left_scan_codes = key_to_scan_codes('left ' + normalized, False)
         right_scan_codes = key_to_scan_codes('right ' + normalized, False)
-        return left_scan_codes + tuple(c for c in right_scan_codes if c not in left_scan_codes)
+        t = left_scan_codes + tuple(c for c in right_scan_codes if c not in left_scan_codes)
+        if t:
+            _key_scan_codes[key] = t
+        return t
 
     try:
         # Put items in ordered dict to remove duplicates.
@@ -441,8 +564,13 @@ def key_to_scan_codes(key, error_if_missing=True):
     if not t and error_if_missing:
         raise ValueError('Key {} is not mapped to any known key.'.format(repr(key)), e)
     else:
+        if t:
+            _key_scan_codes[key] = t
         return t
 
+_hotkey_steps_separator = _re.compile(r',\s?')
+_hotkey_keys_separator = _re.compile(r'\s?\+\s?')
+_parsed_hotkeys = {}
 def parse_hotkey(hotkey):
     """
     Parses a user-provided hotkey into nested tuples representing the
@@ -458,7 +586,7 @@ def parse_hotkey(hotkey):
 
         # ((alt_codes, shift_codes, a_codes), (alt_codes, b_codes), (c_codes,))
     """
-    if _is_number(hotkey) or len(hotkey) == 1:
+    if _is_number(hotkey):
         scan_codes = key_to_scan_codes(hotkey)
         step = (scan_codes,)
         steps = (step,)
@@ -470,11 +598,26 @@ def parse_hotkey(hotkey):
             return steps
         return hotkey
 
-    steps = []
-    for step in _re.split(r',\s?', hotkey):
-        keys = _re.split(r'\s?\+\s?', step)
-        steps.append(tuple(key_to_scan_codes(key) for key in keys))
-    return tuple(steps)
+    # Functions like `send` and `is_pressed` parse the same hotkey strings
+    # over and over, so remember the results. This includes single characters,
+    # the most common argument to `send`.
+    try:
+        return _parsed_hotkeys[hotkey]
+    except KeyError:
+        pass
+
+    if len(hotkey) == 1:
+        steps = ((key_to_scan_codes(hotkey),),)
+    else:
+        steps = []
+        for step in _hotkey_steps_separator.split(hotkey):
+            keys = _hotkey_keys_separator.split(step)
+            steps.append(tuple(key_to_scan_codes(key) for key in keys))
+        steps = tuple(steps)
+    if len(_parsed_hotkeys) >= _max_cache_size:
+        _parsed_hotkeys.clear()
+    _parsed_hotkeys[hotkey] = steps
+    return steps
 
 def send(hotkey, do_press=True, do_release=True):
     """
@@ -536,22 +679,56 @@ def is_pressed(hotkey):
     if len(steps) > 1:
         raise ValueError("Impossible to check if multi-step hotkeys are pressed (`a+b` is ok, `a, b` isn't).")
 
-    # Convert _pressed_events into a set 
+    # Check membership directly instead of copying _pressed_events.
     with _pressed_events_lock:
-        pressed_scan_codes = set(_pressed_events)
-    for scan_codes in steps[0]:
-        if not any(scan_code in pressed_scan_codes for scan_code in scan_codes):
-            return False
+        for scan_codes in steps[0]:
+            for scan_code in scan_codes:
+                if scan_code in _pressed_events:
+                    break
+            else:
+                return False
     return True
 
+# Pending `call_later` calls, as a heap of (deadline, order, fn, args), all
+# executed by a single background thread instead of one thread per call.
+_delayed_calls = []
+_delayed_calls_condition = _Condition()
+_delayed_calls_order = _itertools.count()
+_delayed_calls_thread = None
+def _process_delayed_calls():
+    while True:
+        with _delayed_calls_condition:
+            while True:
+                if not _delayed_calls:
+                    _delayed_calls_condition.wait()
+                    continue
+                remaining = _delayed_calls[0][0] - _time.monotonic()
+                if remaining <= 0:
+                    break
+                _delayed_calls_condition.wait(remaining)
+            deadline, order, fn, args = _heapq.heappop(_delayed_calls)
+        try:
+            fn(*args)
+        except Exception:
+            _traceback.print_exc()
+
 def call_later(fn, args=(), delay=0.001):
     """
-    Calls the provided function in a new thread after waiting some time.
+    Calls the provided function in a background thread after waiting some time.
     Useful for giving the system some time to process an event, without blocking
     the current execution flow.
+
+    Note: all delayed calls share the same thread and run one at a time, so
+    `fn` should return quickly.
     """
-    thread = _Thread(target=lambda: (_time.sleep(delay), fn(*args)))
-    thread.start()
+    global _delayed_calls_thread
+    with _delayed_calls_condition:
+        if _delayed_calls_thread is None:
+            _delayed_calls_thread = _Thread(target=_process_delayed_calls)
+            _delayed_calls_thread.daemon = True
+            _delayed_calls_thread.start()
+        _heapq.heappush(_delayed_calls, (_time.monotonic() + delay, next(_delayed_calls_order), fn, args))
+        _delayed_calls_condition.notify()
 
 _hooks = {}
 def hook(callback, suppress=False, on_remove=lambda: None):
@@ -570,11 +747,23 @@ def hook(callback, suppress=False, on_remove=lambda: None):
 
     Returns the given callback for easier development.
     """
+    return _add_hook(callback, suppress, on_remove)
+
+def _add_hook(callback, suppress=False, on_remove=lambda: None, event_type=None):
+    """
+    Implementation of `hook`. Non-suppressing hooks can be restricted to a
+    single `event_type`, which the listener filters before calling them.
+    """
     if suppress:
         _listener.start_if_necessary()
         append, remove = _listener.blocking_hooks.append, _listener.blocking_hooks.remove
+        if event_type is not None:
+            unfiltered_callback = callback
+            callback = lambda e: e.event_type != event_type or unfiltered_callback(e)
     else:
         append, remove = _listener.add_handler, _listener.remove_handler
+        if event_type is not None:
+            callback = _TypedHandler(callback, event_type)
 
     append(callback)
     def remove_():
@@ -589,13 +778,13 @@ def on_press(callback, suppress=False):
     """
     Invokes `callback` for every KEY_DOWN event. For details see `hook`.
     """
-    return hook(lambda e: e.event_type == KEY_UP or callback(e), suppress=suppress)
+    return _add_hook(callback, suppress, event_type=KEY_DOWN)
 
 def on_release(callback, suppress=False):
     """
     Invokes `callback` for every KEY_UP event. For details see `hook`.
     """
-    return hook(lambda e: e.event_type == KEY_DOWN or callback(e), suppress=suppress)
+    return _add_hook(callback, suppress, event_type=KEY_UP)
 
 def hook_key(key, callback, suppress=False):
     """
@@ -606,18 +795,34 @@ def hook_key(key, callback, suppress=False):
     Note: this function shares state with hotkeys, so `clear_all_hotkeys`
     affects it as well.
     """
+    return _hook_key(key, callback, suppress, (KEY_DOWN, KEY_UP))
+
+def _hook_key(key, callback, suppress, event_types):
+    """
+    Implementation of `hook_key`, for the events of the given types only.
+    """
     _listener.start_if_necessary()
     store = _listener.blocking_keys if suppress else _listener.nonblocking_keys
-    scan_codes = key_to_scan_codes(key)
-    for scan_code in scan_codes:
-        store[scan_code].append(callback)
+    if len(event_types) == 1:
+        # `on_press_key`/`on_release_key` get their own object, so removing
+        # one never touches the other's registration of the same callback.
+        callback = _TypedHandler(callback, event_types[0])
+    # Key hooks are stored by scan code and event type, so hooks for a single
+    # event type are never called for the other one.
+    store_keys = [(scan_code, event_type) for scan_code in key_to_scan_codes(key) for event_type in event_types]
+    for store_key in store_keys:
+        store[store_key].append(callback)
 
     def remove_():
         _hooks.pop(callback, None)
         _hooks.pop(key, None)
         _hooks.pop(remove_ ,None)
-        for scan_code in scan_codes:
-            store[scan_code].remove(callback)
+        for store_key in store_keys:
+            key_hooks = store[store_key]
+            key_hooks.remove(callback)
+            # Keeps `blocking_keys` empty, and skipped, once all are removed.
+            if not key_hooks:
+                del store[store_key]
     _hooks[callback] = _hooks[key] = _hooks[remove_] = remove_
     return remove_
 
@@ -625,13 +830,13 @@ def on_press_key(key, callback, suppress=False):
     """
     Invokes `callback` for KEY_DOWN event related to the given key. For details see `hook`.
     """
-    return hook_key(key, lambda e: e.event_type == KEY_UP or callback(e), suppress=suppress)
+    return _hook_key(key, callback, suppress, (KEY_DOWN,))
 
 def on_release_key(key, callback, suppress=False):
     """
     Invokes `callback` for KEY_UP event related to the given key. For details see `hook`.
     """
-    return hook_key(key, lambda e: e.event_type == KEY_DOWN or callback(e), suppress=suppress)
+    return _hook_key(key, callback, suppress, (KEY_UP,))
 
 def unhook(remove):
     """
@@ -650,7 +855,9 @@ def unhook_all():
     _listener.blocking_keys.clear()
     _listener.nonblocking_keys.clear()
     del _listener.blocking_hooks[:]
-    del _listener.handlers[:]
+    _listener.remove_all_handlers()
+    _hooks.clear()
+    _word_listeners.clear()
     unhook_all_hotkeys()
 
 def block_key(key):
@@ -674,12 +881,22 @@ def remap_key(src, dst):
     return hook_key(src, handler, suppress=True)
 unremap_key = unhook_key
 
+_parsed_hotkey_combinations = {}
 def parse_hotkey_combinations(hotkey):
     """
     Parses a user-provided hotkey. Differently from `parse_hotkey`,
     instead of each step being a list of the different scan codes for each key,
     each step is a list of all possible combinations of those scan codes.
     """
+    # Hotkeys are often added and removed repeatedly (e.g. toggling remaps),
+    # and the combinations are immutable, so expand each hotkey only once.
+    is_hashable = _is_str(hotkey) or _is_number(hotkey)
+    if is_hashable:
+        try:
+            return _parsed_hotkey_combinations[hotkey]
+        except KeyError:
+            pass
+
     def combine_step(step):
         # A single step may be composed of many keys, and each key can have
         # multiple scan codes. To speed up hotkey matching and avoid introducing
@@ -688,9 +905,21 @@ def parse_hotkey_combinations(hotkey):
         # this is not as insane as it sounds.
         return (tuple(sorted(scan_codes)) for scan_codes in _itertools.product(*step))
 
-    return tuple(tuple(combine_step(step)) for step in parse_hotkey(hotkey))
+    combinations = tuple(tuple(combine_step(step)) for step in parse_hotkey(hotkey))
+    if is_hashable:
+        if len(_parsed_hotkey_combinations) >= _max_cache_size:
+            _parsed_hotkey_combinations.clear()
+        _parsed_hotkey_combinations[hotkey] = combinations
+    return combinations
 
-def _add_hotkey_step(handler, combinations, suppress):
+def _hotkey_step_modifiers(combinations):
+    """
+    Lists the scan codes of a hotkey step that are modifiers, once for each
+    combination they appear in.
+    """
+    return [scan_code for scan_codes in combinations for scan_code in scan_codes if is_modifier(scan_code)]
+
+def _add_hotkey_step(handler, combinations, suppress, modifiers=None):
     """
     Hooks a single-step hotkey (e.g. 'shift+a').
     """
@@ -699,18 +928,22 @@ def _add_hotkey_step(handler, combinations, suppress):
     # Register the scan codes of every possible combination of
     # modfiier + main key. Modifiers have to be registered in 
     # filtered_modifiers too, so suppression and replaying can work.
+    # Resolve which scan codes are modifiers only once, `remove` reuses it.
+    if modifiers is None:
+        modifiers = _hotkey_step_modifiers(combinations)
+    _listener.filtered_modifiers.update(modifiers)
     for scan_codes in combinations:
-        for scan_code in scan_codes:
-            if is_modifier(scan_code):
-                _listener.filtered_modifiers[scan_code] += 1
         container[scan_codes].append(handler)
 
     def remove():
+        _listener.filtered_modifiers.subtract(modifiers)
         for scan_codes in combinations:
-            for scan_code in scan_codes:
-                if is_modifier(scan_code):
-                    _listener.filtered_modifiers[scan_code] -= 1
-            container[scan_codes].remove(handler)
+            handlers = container[scan_codes]
+            handlers.remove(handler)
+            # Once no suppressed hotkey is left, `direct_callback` skips the
+            # whole suppression machinery again.
+            if not handlers:
+                del container[scan_codes]
     return remove
 
 _hotkeys = {}
@@ -776,6 +1009,14 @@ def add_hotkey(hotkey, callback, args=(), suppress=False, timeout=1, trigger_on_
         _hotkeys[hotkey] = _hotkeys[remove_] = _hotkeys[callback] = remove_
         return remove_
 
+    # Scan codes accepted at each step, and the modifiers among them, resolved
+    # once at registration instead of every time the hotkey advances a step.
+    allowed_keys_by_step = [
+        frozenset().union(*step)
+        for step in steps
+    ]
+    modifiers_by_step = [_hotkey_step_modifiers(step) for step in steps]
+
     state = _State()
     state.remove_catch_misses = lambda: None
     state.remove_last_step = None
@@ -805,6 +1046,31 @@ def add_hotkey(hotkey, callback, args=(), suppress=False, timeout=1, trigger_on_
             set_index(0)
         return True
 
+    def last_step_handler(event):
+        if event.event_type == KEY_UP:
+            state.remove_last_step()
+            set_index(0)
+        accept = event.event_type == event_type and callback() 
+        if accept:
+            return catch_misses(event, force_fail=True)
+        else:
+            state.suppressed_events[:] = [event]
+            return False
+
+    def make_step_handler(new_index):
+        def handler(event):
+            if event.event_type == KEY_UP:
+                state.remove_last_step()
+                set_index(new_index)
+            state.suppressed_events.append(event)
+            return False
+        return handler
+
+    # One handler per step, created once instead of on every step change.
+    # `state.remove_last_step` is always the remover of the handler currently
+    # registered, so the handlers use it to unregister themselves.
+    step_handlers = [make_step_handler(index + 1) for index in range(len(steps) - 1)] + [last_step_handler]
+
     def set_index(new_index):
         state.index = new_index
 
@@ -818,37 +1084,11 @@ def add_hotkey(hotkey, callback, args=(), suppress=False, timeout=1, trigger_on_
             # Must be `suppress=True` to ensure `send` has priority.
             state.remove_catch_misses = hook(catch_misses, suppress=True)
 
-        if new_index == len(steps) - 1:
-            def handler(event):
-                if event.event_type == KEY_UP:
-                    remove()
-                    set_index(0)
-                accept = event.event_type == event_type and callback() 
-                if accept:
-                    return catch_misses(event, force_fail=True)
-                else:
-                    state.suppressed_events[:] = [event]
-                    return False
-            remove = _add_hotkey_step(handler, steps[state.index], suppress)
-        else:
-            # Fix value of next_index.
-            def handler(event, new_index=state.index+1):
-                if event.event_type == KEY_UP:
-                    remove()
-                    set_index(new_index)
-                state.suppressed_events.append(event)
-                return False
-            remove = _add_hotkey_step(handler, steps[state.index], suppress)
-        state.remove_last_step = remove
+        state.remove_last_step = _add_hotkey_step(step_handlers[new_index], steps[new_index], suppress, modifiers_by_step[new_index])
         state.last_update = _time.monotonic()
         return False
     set_index(0)
 
-    allowed_keys_by_step = [
-        set().union(*step)
-        for step in steps
-    ]
-
     def remove_():
         state.remove_catch_misses()
         state.remove_last_step()
@@ -875,9 +1115,12 @@ def unhook_all_hotkeys():
     `record`ers and `wait`s.
     """
     # Because of "alises" some hooks may have more than one entry, all of which
-    # are removed together.
+    # are removed together. The removers are dropped in bulk too, instead of
+    # calling each one and searching the containers for its handler.
     _listener.blocking_hotkeys.clear()
     _listener.nonblocking_hotkeys.clear()
+    _listener.filtered_modifiers.clear()
+    _hotkeys.clear()
 unregister_all_hotkeys = remove_all_hotkeys = clear_all_hotkeys = unhook_all_hotkeys
 
 def remap_hotkey(src, dst, suppress=True, trigger_on_release=False):
@@ -890,7 +1133,8 @@ def remap_hotkey(src, dst, suppress=True, trigger_on_release=False):
         remap('alt+w', 'ctrl+up')
     """
     def handler():
-        active_modifiers = sorted(modifier for modifier, state in _listener.modifier_states.items() if state == 'allowed')
+        allowed = _modifier_state_ids['allowed']
+        active_modifiers = sorted(modifier for modifier, state in _listener.modifier_states.items() if state == allowed)
         for modifier in active_modifiers:
             release(modifier)
         send(dst)
@@ -907,9 +1151,10 @@ def stash_state():
     """
     # TODO: stash caps lock / numlock /scrollock state.
     with _pressed_events_lock:
-        state = sorted(_pressed_events)
+        state = list(_pressed_events)
+    release = _os_keyboard.release
     for scan_code in state:
-        _os_keyboard.release(scan_code)
+        release(scan_code)
     return state
 
 def restore_state(scan_codes):
@@ -919,13 +1164,15 @@ def restore_state(scan_codes):
     """
     _listener.is_replaying = True
 
+    # Snapshot once, _pressed_events changes as we press and release keys.
     with _pressed_events_lock:
         current = set(_pressed_events)
     target = set(scan_codes)
+    release, press = _os_keyboard.release, _os_keyboard.press
     for scan_code in current - target:
-        _os_keyboard.release(scan_code)
+        release(scan_code)
     for scan_code in target - current:
-        _os_keyboard.press(scan_code)
+        press(scan_code)
 
     _listener.is_replaying = False
 
@@ -967,26 +1214,44 @@ def write(text, delay=0, restore_state_after=True, exact=None):
                 _os_keyboard.type_unicode(letter)
             if delay: _time.sleep(delay)
     else:
+        os_press, os_release = _os_keyboard.press, _os_keyboard.release
+        # Texts repeat the same few letters, so map each one only once.
+        mappings = {}
+        # Consecutive letters typed with the same modifiers (e.g. "HELLO")
+        # share a single press and release of those modifiers.
+        held_modifiers = ()
         for letter in text:
-            try:
-                entries = _os_keyboard.map_name(normalize_name(letter))
-                scan_code, modifiers = next(iter(entries))
-            except (KeyError, ValueError, StopIteration):
+            if letter not in mappings:
+                try:
+                    entries = _os_keyboard.map_name(normalize_name(letter))
+                    mappings[letter] = next(iter(entries))
+                except (KeyError, ValueError, StopIteration):
+                    mappings[letter] = None
+            mapping = mappings[letter]
+            if mapping is None:
+                for modifier in held_modifiers:
+                    release(modifier)
+                held_modifiers = ()
                 _os_keyboard.type_unicode(letter)
                 continue
-            
-            for modifier in modifiers:
-                press(modifier)
+            scan_code, modifiers = mapping
 
-            _os_keyboard.press(scan_code)
-            _os_keyboard.release(scan_code)
+            if modifiers != held_modifiers:
+                for modifier in held_modifiers:
+                    release(modifier)
+                for modifier in modifiers:
+                    press(modifier)
+                held_modifiers = modifiers
 
-            for modifier in modifiers:
-                release(modifier)
+            os_press(scan_code)
+            os_release(scan_code)
 
             if delay:
                 _time.sleep(delay)
 
+        for modifier in held_modifiers:
+            release(modifier)
+
     if restore_state_after:
         restore_modifiers(state)
 
@@ -997,13 +1262,29 @@ def wait(hotkey=None, suppress=False, trigger_on_release=False):
     """
     if hotkey:
         lock = _Event()
-        remove = add_hotkey(hotkey, lambda: lock.set(), suppress=suppress, trigger_on_release=trigger_on_release)
+        remove = add_hotkey(hotkey, lock.set, suppress=suppress, trigger_on_release=trigger_on_release)
         lock.wait()
         remove_hotkey(remove)
     else:
         while True:
             _time.sleep(1e6)
 
+# https://developer.apple.com/macos/human-interface-guidelines/input-and-output/keyboard/
+# > List modifier keys in the correct order. If you use more than one modifier key in a
+# > hotkey, always list them in this order: Control, Option, Shift, Command.
+_hotkey_modifiers_order = {'ctrl': 0, 'alt': 1, 'shift': 2, 'windows': 3}
+
+def _clean_hotkey_name_part(name):
+    """
+    Removes the "left"/"right" prefix from a key name and spells out "+".
+    """
+    if name.startswith('left '):
+        name = name[len('left '):]
+    elif name.startswith('right '):
+        name = name[len('right '):]
+    return name.replace('+', 'plus') if '+' in name else name
+
+_hotkey_names = {}
 def get_hotkey_name(names=None):
     """
     Returns a string representation of hotkey from the given key names, or
@@ -1024,16 +1305,31 @@ def get_hotkey_name(names=None):
     if names is None:
         _listener.start_if_necessary()
         with _pressed_events_lock:
-            names = [e.name for e in _pressed_events.values()]
+            names = list(_pressed_names)
     else:
         names = [normalize_name(name) for name in names]
-    clean_names = set(e.replace('left ', '').replace('right ', '').replace('+', 'plus') for e in names)
-    # https://developer.apple.com/macos/human-interface-guidelines/input-and-output/keyboard/
-    # > List modifier keys in the correct order. If you use more than one modifier key in a
-    # > hotkey, always list them in this order: Control, Option, Shift, Command.
-    modifiers = ['ctrl', 'alt', 'shift', 'windows']
-    sorting_key = lambda k: (modifiers.index(k) if k in modifiers else 5, str(k))
-    return '+'.join(sorted(clean_names, key=sorting_key))
+
+    # The result only depends on the set of names, and the same few
+    # combinations are asked for over and over.
+    names_key = frozenset(names)
+    try:
+        return _hotkey_names[names_key]
+    except KeyError:
+        pass
+
+    clean_names = set(map(_clean_hotkey_name_part, names))
+    # Modifiers and regular keys are split in one pass and sorted separately,
+    # each with a cheap key.
+    modifiers = []
+    others = []
+    for name in clean_names:
+        (modifiers if name in _hotkey_modifiers_order else others).append(name)
+    modifiers.sort(key=_hotkey_modifiers_order.__getitem__)
+    others.sort()
+    if len(_hotkey_names) >= _max_cache_size:
+        _hotkey_names.clear()
+    hotkey_name = _hotkey_names[names_key] = '+'.join(modifiers + others)
+    return hotkey_name
 
 def read_event(suppress=False):
     """
@@ -1066,15 +1362,15 @@ def read_hotkey(suppress=True):
         # "ctrl+shift+p"
     """
     queue = _queue.Queue()
-    fn = lambda e: queue.put(e) or e.event_type == KEY_DOWN
+    # Only the first release matters, so key presses are let through without
+    # waking up the reading thread.
+    fn = lambda e: e.event_type == KEY_DOWN or queue.put(e)
     hooked = hook(fn, suppress=suppress)
-    while True:
-        event = queue.get()
-        if event.event_type == KEY_UP:
-            unhook(hooked)
-            with _pressed_events_lock:
-                names = [e.name for e in _pressed_events.values()] + [event.name]
-            return get_hotkey_name(names)
+    event = queue.get()
+    unhook(hooked)
+    with _pressed_events_lock:
+        names = _pressed_names + [event.name]
+    return get_hotkey_name(names)
 
 def get_typed_strings(events, allow_backspace=True):
     """
@@ -1097,42 +1393,68 @@ def get_typed_strings(events, allow_backspace=True):
 
     shift_pressed = False
     capslock_pressed = False
-    string = ''
+    # Only changes with shift or caps lock, not worth recomputing per character.
+    uppercase = False
+    # Characters of the current string, joined only when it's yielded.
+    chars = []
+    append = chars.append
     for event in events:
+        # Read each attribute only once, this loop may run over very long
+        # recordings.
         name = event.name
+        is_down = event.event_type == KEY_DOWN
 
         # Space is the only key that we _parse_hotkey to the spelled out name
         # because of legibility. Now we have to undo that.
-        if event.name == 'space':
+        if name == 'space':
             name = ' '
 
-        if 'shift' in event.name:
-            shift_pressed = event.event_type == 'down'
-        elif event.name == 'caps lock' and event.event_type == 'down':
+        # Most events are plain characters, so test for them first instead of
+        # after every special key.
+        if len(name) == 1:
+            if is_down:
+                append(name.upper() if uppercase else name)
+        elif 'shift' in name:
+            shift_pressed = is_down
+            uppercase = shift_pressed ^ capslock_pressed
+        elif name == 'caps lock' and is_down:
             capslock_pressed = not capslock_pressed
-        elif allow_backspace and event.name == backspace_name and event.event_type == 'down':
-            string = string[:-1]
-        elif event.event_type == 'down':
-            if len(name) == 1:
-                if shift_pressed ^ capslock_pressed:
-                    name = name.upper()
-                string = string + name
-            else:
-                yield string
-                string = ''
-    yield string
+            uppercase = shift_pressed ^ capslock_pressed
+        elif allow_backspace and name == backspace_name and is_down:
+            if chars:
+                chars.pop()
+        elif is_down:
+            yield ''.join(chars)
+            del chars[:]
+    yield ''.join(chars)
 
 _recording = None
-def start_recording(recorded_events_queue=None):
+def start_recording(recorded_events_queue=None, max_events=None):
     """
     Starts recording all keyboard events into a global variable, or the given
     queue if any. Returns the queue of events and the hooked function.
 
+    - `max_events` if given, only the most recent `max_events` events are kept
+    and older ones are discarded, bounding the memory used by long recordings.
+    The events are then stored in a `collections.deque` instead of a queue.
+    Ignored if `recorded_events_queue` is given.
+
+    `recorded_events_queue` may also be a `collections.deque`, which is
+    appended to without the locking done by queues.
+
     Use `stop_recording()` or `unhook(hooked_function)` to stop.
     """
-    recorded_events_queue = recorded_events_queue or _queue.Queue()
+    if recorded_events_queue is None and max_events:
+        recorded_events_queue = _collections.deque(maxlen=max_events)
+    if isinstance(recorded_events_queue, _collections.deque):
+        # Not the bound method itself: hooks are stored by callback, and
+        # Python 2 can't hash the methods of an unhashable deque.
+        hooked = hook(lambda e: recorded_events_queue.append(e))
+    else:
+        recorded_events_queue = recorded_events_queue or _queue.Queue()
+        hooked = hook(recorded_events_queue.put)
     global _recording
-    _recording = (recorded_events_queue, hook(recorded_events_queue.put))
+    _recording = (recorded_events_queue, hooked)
     return _recording
 
 def stop_recording():
@@ -1145,19 +1467,27 @@ def stop_recording():
         raise ValueError('Must call "start_recording" before.')
     recorded_events_queue, hooked = _recording
     unhook(hooked)
-    return list(recorded_events_queue.queue)
+    if isinstance(recorded_events_queue, _collections.deque):
+        return list(recorded_events_queue)
+    # Copy under the queue's own lock, other threads may still be using it.
+    with recorded_events_queue.mutex:
+        return list(recorded_events_queue.queue)
 
-def record(until='escape', suppress=False, trigger_on_release=False):
+def record(until='escape', suppress=False, trigger_on_release=False, max_events=None):
     """
     Records all keyboard events from all keyboards until the user presses the
     given hotkey. Then returns the list of events recorded, of type
     `keyboard.KeyboardEvent`. Pairs well with
     `play(events)`.
 
+    - `max_events` if given, only the most recent `max_events` events are
+    returned (see `start_recording`).
+
     Note: this is a blocking function.
     Note: for more details on the keyboard hook and events see `hook`.
     """
-    start_recording()
+    # The events never leave this function, no need for a thread-safe queue.
+    start_recording(_collections.deque(maxlen=max_events or None))
     wait(until, suppress=suppress, trigger_on_release=trigger_on_release)
     return stop_recording()
 
@@ -1172,11 +1502,18 @@ def play(events, speed_factor=1.0):
     """
     state = stash_state()
 
-    last_time = None
+    # Sleep until each event's deadline relative to the first event, instead of
+    # the gap since the previous one, so the time spent sending events doesn't
+    # accumulate as drift over long replays.
+    start_time = first_event_time = None
     for event in events:
-        if speed_factor > 0 and last_time is not None:
-            _time.sleep((event.time - last_time) / speed_factor)
-        last_time = event.time
+        if speed_factor > 0:
+            if start_time is None:
+                start_time, first_event_time = _time.monotonic(), event.time
+            else:
+                delay = start_time + (event.time - first_event_time) / speed_factor - _time.monotonic()
+                if delay > 0:
+                    _time.sleep(delay)
 
         key = event.scan_code or event.name
         press(key) if event.event_type == KEY_DOWN else release(key)
@@ -1185,6 +1522,79 @@ def play(events, speed_factor=1.0):
 replay = play
 
 _word_listeners = {}
+class _WordListeners(object):
+    """
+    Single hook shared by all word listeners. Typed characters are kept in one
+    buffer, and the words are only checked when one of their trigger keys is
+    pressed, instead of running a handler per listener for every key. Each
+    listener remembers how much of the buffer it has already consumed, so a
+    match only starts a new word for that listener.
+    """
+    def __init__(self):
+        self.by_trigger = {} # trigger name -> [listener]
+        self.chars = []
+        self.times = []
+        # Characters discarded from the start of the buffer so far. Listeners
+        # store absolute positions, so clearing the buffer doesn't require
+        # updating every one of them.
+        self.discarded = 0
+
+    def position(self):
+        """ Absolute position of the end of the buffer. """
+        return self.discarded + len(self.chars)
+
+    def typed_word(self, first, timeout, time):
+        """
+        Returns the characters typed from position `first` or since the last
+        pause longer than `timeout`, whichever is later.
+        """
+        times = self.times
+        first = max(first - self.discarded, 0)
+        start = len(times)
+        if not timeout:
+            start = first
+        while start > first and time - times[start-1] <= timeout:
+            start -= 1
+            time = times[start]
+        return ''.join(self.chars[start:])
+
+    def __call__(self, event):
+        name = event.name
+        if event.event_type == KEY_UP or name in all_modifiers: return
+
+        matched = []
+        listeners = self.by_trigger.get(name)
+        if listeners:
+            typed_by_key = {}
+            for listener in list(listeners):
+                key = (listener.consumed, listener.timeout)
+                if key not in typed_by_key:
+                    typed_by_key[key] = self.typed_word(listener.consumed, listener.timeout, event.time)
+                typed = typed_by_key[key]
+                if typed == listener.word or (listener.match_suffix and typed.endswith(listener.word)):
+                    matched.append(listener)
+
+        if len(name) > 1:
+            self.discarded += len(self.chars)
+            del self.chars[:]
+            del self.times[:]
+        else:
+            self.chars.append(name)
+            self.times.append(event.time)
+
+        # Matched listeners start over after this key, the others keep their
+        # words going.
+        for listener in matched:
+            listener.consumed = self.position()
+
+        # Called only once the state is updated, so a failing callback doesn't
+        # affect the other listeners.
+        for listener in matched:
+            try:
+                listener.callback()
+            except Exception:
+                _traceback.print_exc()
+_word_listeners_hook = None
 def add_word_listener(word, callback, triggers=['space'], match_suffix=False, timeout=2):
     """
     Invokes a callback every time a sequence of characters is typed (e.g. 'pet')
@@ -1210,38 +1620,40 @@ def add_word_listener(word, callback, triggers=['space'], match_suffix=False, ti
     Note: all actions are performed on key down. Key up events are ignored.
     Note: word matches are **case sensitive**.
     """
-    state = _State()
-    state.current = ''
-    state.time = -1
-
-    def handler(event):
-        name = event.name
-        if event.event_type == KEY_UP or name in all_modifiers: return
-
-        if timeout and event.time - state.time > timeout:
-            state.current = ''
-        state.time = event.time
-
-        matched = state.current == word or (match_suffix and state.current.endswith(word))
-        if name in triggers and matched:
-            callback()
-            state.current = ''
-        elif len(name) > 1:
-            state.current = ''
-        else:
-            state.current += name
+    global _word_listeners_hook
+    # `unhook_all` may have removed the shared hook, start over in that case.
+    if _word_listeners_hook is None or _word_listeners_hook not in _listener.handlers:
+        _word_listeners_hook = _WordListeners()
+        _word_listeners_hook.remove_hook = hook(_word_listeners_hook)
+    word_listeners_hook = _word_listeners_hook
+
+    entry = _State()
+    entry.word, entry.callback = word, callback
+    entry.match_suffix, entry.timeout = match_suffix, timeout
+    # Characters typed before the listener was added are not part of its words.
+    entry.consumed = word_listeners_hook.position()
+    for trigger in triggers:
+        word_listeners_hook.by_trigger.setdefault(trigger, []).append(entry)
 
-    hooked = hook(handler)
     def remove():
-        hooked()
-        if word in _word_listeners:
+        global _word_listeners_hook
+        by_trigger = word_listeners_hook.by_trigger
+        for trigger in triggers:
+            entries = by_trigger.get(trigger, [])
+            if entry in entries:
+                entries.remove(entry)
+            if not entries:
+                by_trigger.pop(trigger, None)
+        if not by_trigger:
+            word_listeners_hook.remove_hook()
+            if _word_listeners_hook is word_listeners_hook:
+                _word_listeners_hook = None
+        if _word_listeners.get(word) is remove:
             del _word_listeners[word]
-        if handler in _word_listeners:
-            del _word_listeners[handler]
-        if remove in _word_listeners:
-            del _word_listeners[remove]
-    _word_listeners[word] = _word_listeners[handler] = _word_listeners[remove] = remove
-    # TODO: allow multiple word listeners and removing them correctly.
+        _word_listeners.pop(remove, None)
+    # Removing by `word` removes the latest listener of that word. Earlier ones
+    # can still be removed with the handler returned here.
+    _word_listeners[word] = _word_listeners[remove] = remove
     return remove
 
 def remove_word_listener(word_or_handler):
@@ -1230,6 +1230,13 @@ if platform.system() == 'Linux':
         'prior': 'page up',
     })
 
+# Caches keyed by user-provided names and hotkeys are emptied when they reach
+# this size, so programs generating arbitrary names don't grow them forever.
+_max_cache_size = 1024
+
+# Normalization is called for every event and every key in a hotkey, but there
+# are only so many key names. Cache the results.
+_normalized_names = {}
 def normalize_name(name):
     """
     Given a key name (e.g. "LEFT CONTROL"), clean up the string and convert to
@@ -1238,9 +1245,18 @@ def normalize_name(name):
     if not name or not isinstance(name, basestring):
         raise ValueError('Can only normalize non-empty string names. Unexpected '+ repr(name))
 
+    try:
+        return _normalized_names[name]
+    except KeyError:
+        pass
+
+    original = name
     if len(name) > 1:
         name = name.lower()
     if name != '_' and '_' in name:
         name = name.replace('_', ' ')
 
-    return canonical_names.get(name, name)
+    if len(_normalized_names) >= _max_cache_size:
+        _normalized_names.clear()
+    normalized = _normalized_names[original] = canonical_names.get(name, name)
+    return normalized
@@ -16,8 +16,14 @@ class GenericListener(object):
         self.listening = False
         self.queue = Queue()
 
+    def get_handlers(self, event):
+        """
+        Returns the handlers that should receive the given event.
+        """
+        return self.handlers
+
     def invoke_handlers(self, event):
-        for handler in self.handlers:
+        for handler in self.get_handlers(event):
             try:
                 if handler(event):
                     # Stop processing this hotkey.
@@ -110,6 +110,8 @@ class TestKeyboard(unittest.TestCase):
         del output_events[:]
         keyboard._recording = None
         keyboard._pressed_events.clear()
+        del keyboard._pressed_names[:]
+        keyboard._pressed_scan_codes = ()
         keyboard._physically_pressed_keys.clear()
         keyboard._logically_pressed_keys.clear()
         keyboard._hotkeys.clear()
@@ -276,6 +278,13 @@ class TestKeyboard(unittest.TestCase):
         time.sleep(0.05)
         self.assertTrue(triggered)
 
+    def test_call_later_order(self):
+        triggered = []
+        keyboard.call_later(triggered.append, (2,), 0.02)
+        keyboard.call_later(triggered.append, (1,), 0.01)
+        time.sleep(0.05)
+        self.assertEqual(triggered, [1, 2])
+
     def test_hook_nonblocking(self):
         self.i = 0
         def count(e):
@@ -320,6 +329,61 @@ class TestKeyboard(unittest.TestCase):
     def test_on_release(self):
         keyboard.on_release(lambda e: self.assertEqual(e.name, 'a') and self.assertEqual(e.event_type, KEY_UP))
         self.do(d_a+u_a)
+    def test_on_press_on_release_same_callback(self):
+        events = []
+        remove_press = keyboard.on_press(events.append)
+        keyboard.on_release(events.append)
+        keyboard.hook(lambda e: events.append(e.event_type))
+        self.do(d_a+u_a)
+        self.assertEqual(events, d_a+[KEY_DOWN]+u_a+[KEY_UP])
+        del events[:]
+        remove_press()
+        self.do(d_a+u_a)
+        self.assertEqual(events, [KEY_DOWN]+u_a+[KEY_UP])
+
+    def test_on_press_twice_remove_one(self):
+        events = []
+        remove_first = keyboard.on_press(events.append)
+        keyboard.on_press(events.append)
+        remove_first()
+        self.do(du_a)
+        self.assertEqual(events, d_a)
+
+    def test_on_press_removed_while_dispatching(self):
+        events = []
+        keyboard.on_press(lambda e: remove_second())
+        remove_second = keyboard.on_press(events.append)
+        self.do(du_a+du_b)
+        self.assertEqual(events, [])
+
+    def test_on_press_release_key_same_callback(self):
+        events = []
+        remove_press = keyboard.on_press_key('a', events.append)
+        keyboard.on_release_key('a', events.append)
+        self.do(du_a+du_b)
+        self.assertEqual(events, du_a)
+        del events[:]
+        remove_press()
+        self.do(du_a)
+        self.assertEqual(events, u_a)
+
+    def test_on_press_key_twice_remove_one(self):
+        events = []
+        remove_first = keyboard.on_press_key('a', events.append)
+        remove_second = keyboard.on_press_key('a', events.append)
+        remove_first()
+        self.do(du_a)
+        self.assertEqual(events, d_a)
+        self.assertIn(remove_second, keyboard._hooks)
+
+    def test_hook_key_stores_stay_empty(self):
+        remove = keyboard.block_key('a')
+        keyboard.on_press(lambda e: None)
+        self.do(du_b+du_a)
+        remove()
+        self.assertEqual(keyboard._listener.blocking_keys, {})
+        self.assertEqual(keyboard._listener.nonblocking_keys, {})
+        self.assertEqual(keyboard._listener.nonblocking_hotkeys, {})
 
     def test_hook_key_invalid(self):
         with self.assertRaises(ValueError):
@@ -411,6 +475,9 @@ class TestKeyboard(unittest.TestCase):
     def test_write_modifiers(self):
         keyboard.write('Ab', exact=False)
         self.do([], d_shift+d_a+u_a+u_shift+d_b+u_b)
+    def test_write_modifiers_run(self):
+        keyboard.write('AAb', exact=False)
+        self.do([], d_shift+d_a+u_a+d_a+u_a+u_shift+d_b+u_b)
     # restore_state_after has been removed after the introduction of `restore_modifiers`.
     #def test_write_stash_not_restore(self):
     #    self.do(d_shift)
@@ -436,6 +503,10 @@ class TestKeyboard(unittest.TestCase):
         keyboard.start_recording()
         self.do(d_a+u_a)
         self.assertEqual(keyboard.stop_recording(), d_a+u_a)
+    def test_start_stop_recording_max_events(self):
+        keyboard.start_recording(max_events=3)
+        self.do(d_a+u_a+d_b+u_b)
+        self.assertEqual(keyboard.stop_recording(), u_a+d_b+u_b)
     def test_stop_recording_error(self):
         with self.assertRaises(ValueError):
             keyboard.stop_recording()
@@ -453,6 +524,22 @@ class TestKeyboard(unittest.TestCase):
         self.do(du_a+du_b+du_space, du_a+du_b)
         self.assertEqual(queue.get(timeout=0.5), du_a+du_b+du_space)
 
+    def test_record_max_events(self):
+        # Type the events from inside `record`, instead of racing a thread.
+        wait = keyboard.wait
+        keyboard.wait = lambda *args, **kwargs: self.do(du_a+du_b+du_space)
+        try:
+            self.assertEqual(keyboard.record('space', max_events=2), du_space)
+        finally:
+            keyboard.wait = wait
+
+    def test_start_stop_recording_deque(self):
+        events = keyboard._collections.deque()
+        keyboard.start_recording(events)
+        self.do(du_a)
+        self.assertEqual(keyboard.stop_recording(), du_a)
+        self.assertEqual(list(events), du_a)
+
     def test_play_nodelay(self):
         keyboard.play(d_a+u_a, 0)
         self.do([], d_a+u_a)
@@ -499,6 +586,12 @@ class TestKeyboard(unittest.TestCase):
     def test_get_hotkey_name_from_pressed(self):
         self.do(du_c+d_ctrl+d_a+d_b)
         self.assertEqual(keyboard.get_hotkey_name(), 'ctrl+a+b')
+    def test_get_hotkey_name_cache_bounded(self):
+        for i in range(keyboard._max_cache_size + 10):
+            keyboard.get_hotkey_name(['ctrl', 'key{}'.format(i)])
+        self.assertLessEqual(len(keyboard._hotkey_names), keyboard._max_cache_size)
+        self.assertLessEqual(len(keyboard._canonical_names._normalized_names), keyboard._max_cache_size)
+        self.assertEqual(keyboard.get_hotkey_name(['a', 'shift', 'ctrl']), 'ctrl+shift+a')
 
     def test_read_hotkey(self):
         queue = keyboard._queue.Queue()
@@ -597,6 +690,24 @@ class TestKeyboard(unittest.TestCase):
         self.assertTrue(not any(keyboard._listener.filtered_modifiers.values()))
         self.assertTrue(not any(keyboard._listener.blocking_hotkeys.values()))
         self.assertEqual(keyboard._hotkeys, {})
+    def test_unhook_all_clears_removers(self):
+        keyboard.add_hotkey('shift+a', trigger, suppress=True)
+        keyboard.add_hotkey('b, c', trigger)
+        keyboard.hook(trigger)
+        keyboard.add_word_listener('bird', trigger)
+        keyboard.unhook_all()
+        self.assertEqual(keyboard._hotkeys, {})
+        self.assertEqual(keyboard._hooks, {})
+        self.assertEqual(keyboard._word_listeners, {})
+        self.assertTrue(not any(keyboard._listener.filtered_modifiers.values()))
+    def test_remove_hotkey_empties_containers(self):
+        remove = keyboard.add_hotkey('shift+a', trigger, suppress=True)
+        remove()
+        self.assertEqual(keyboard._listener.blocking_hotkeys, {})
+        remove = keyboard.add_hotkey('a, b', trigger)
+        self.do(du_a)
+        remove()
+        self.assertEqual(keyboard._listener.nonblocking_hotkeys, {})
     def test_remove_hotkey_internal_multistep_start(self):
         remove = keyboard.add_hotkey('shift+a, b', trigger, suppress=True)
         self.assertTrue(all(keyboard._listener.blocking_hotkeys.values()))
@@ -791,8 +902,11 @@ class TestKeyboard(unittest.TestCase):
         with self.assertRaises(keyboard._queue.Empty):
             queue.get(timeout=0.01)
     def test_duplicated_word_listener(self):
+        remove_first = keyboard.add_word_listener('abc', trigger)
         keyboard.add_word_listener('abc', trigger)
-        keyboard.add_word_listener('abc', trigger)
+        remove_first()
+        keyboard.remove_word_listener('abc')
+        self.assertFalse(keyboard._word_listeners)
     def test_add_word_listener_remove(self):
         queue = keyboard._queue.Queue()
         def free():
@@ -802,6 +916,41 @@ class TestKeyboard(unittest.TestCase):
         self.do(du_a+du_b+du_c+du_space)
         with self.assertRaises(keyboard._queue.Empty):
             queue.get(timeout=0.01)
+    def test_add_word_listener_multiple(self):
+        queue = keyboard._queue.Queue()
+        keyboard.add_word_listener('abc', lambda: queue.put('abc'))
+        keyboard.add_word_listener('ab', lambda: queue.put('ab'))
+        keyboard.add_word_listener('bc', lambda: queue.put('bc'), match_suffix=True)
+        self.do(du_a+du_b+du_c+du_space+du_a+du_b+du_space)
+        self.assertEqual(sorted(queue.get(timeout=0.5) for i in range(3)), ['ab', 'abc', 'bc'])
+        with self.assertRaises(keyboard._queue.Empty):
+            queue.get(timeout=0.01)
+
+        # A match only restarts the word of the listener that matched.
+        keyboard.add_word_listener('ab', lambda: queue.put('ab,'), triggers=[','])
+        keyboard.add_word_listener('ab,c', lambda: queue.put('ab,c'))
+        du_comma = [make_event(KEY_DOWN, ','), make_event(KEY_UP, ',')]
+        self.do(du_a+du_b+du_comma+du_c+du_space)
+        self.assertEqual([queue.get(timeout=0.5) for i in range(2)], ['ab,', 'ab,c'])
+        with self.assertRaises(keyboard._queue.Empty):
+            queue.get(timeout=0.01)
+    def test_add_word_listener_callback_error(self):
+        queue = keyboard._queue.Queue()
+        def fail():
+            raise ValueError()
+        keyboard.add_word_listener('ab', fail)
+        keyboard.add_word_listener('ab', lambda: queue.put('ab'))
+        print_exc = keyboard._traceback.print_exc
+        keyboard._traceback.print_exc = lambda: None
+        try:
+            self.do(du_a+du_b+du_space+du_a+du_b+du_space)
+        finally:
+            keyboard._traceback.print_exc = print_exc
+        self.assertEqual([queue.get(timeout=0.5) for i in range(2)], ['ab', 'ab'])
+    def test_add_word_listener_remove_twice(self):
+        remove = keyboard.add_word_listener('abc', trigger)
+        remove()
+        remove()
     def test_add_word_listener_suffix_success(self):
         queue = keyboard._queue.Queue()
         def free():
@@ -818,6 +967,36 @@ class TestKeyboard(unittest.TestCase):
         with self.assertRaises(keyboard._queue.Empty):
             queue.get(timeout=0.01)
 
+    def test_nixcommon_read_events(self):
+        import os
+        from . import _nixcommon
+        from ._nixcommon import EV_SYN, EV_KEY, EV_MSC
+        pack = lambda type, code, value: _nixcommon.event_struct.pack(1, 500000, type, code, value)
+        read_fd, write_fd = os.pipe()
+        device = _nixcommon.EventDevice('fake')
+        device._input_file = os.fdopen(read_fd, 'rb')
+        try:
+            os.write(write_fd, pack(EV_MSC, 4, 30) + pack(EV_KEY, 30, 1) + pack(EV_SYN, 0, 0) + pack(EV_MSC, 4, 30) + pack(EV_KEY, 30, 0) + pack(EV_SYN, 0, 0))
+            self.assertEqual(device.read_events(), [(1.5, EV_KEY, 30, 1, 'fake'), (1.5, EV_KEY, 30, 0, 'fake')])
+
+            # The reading thread stays blocked on the pipe, like on a real device.
+            aggregated = _nixcommon.AggregatedEventDevice([device])
+            os.write(write_fd, pack(EV_KEY, 31, 1) + pack(EV_SYN, 0, 0))
+            os.write(write_fd, pack(EV_KEY, 31, 0) + pack(EV_SYN, 0, 0) + pack(EV_KEY, 32, 1) + pack(EV_SYN, 0, 0))
+            self.assertEqual([aggregated.read_event()[1:4] for i in range(3)], [(EV_KEY, 31, 1), (EV_KEY, 31, 0), (EV_KEY, 32, 1)])
+
+            # Closing the device ends its reading thread.
+            os.close(write_fd)
+            write_fd = None
+            aggregated.threads[0].join(1)
+            self.assertFalse(aggregated.threads[0].is_alive())
+            with self.assertRaises(EOFError):
+                device.read_events()
+        finally:
+            if write_fd is not None:
+                os.close(write_fd)
+            device._input_file.close()
+
     #def test_add_abbreviation(self):
     #    keyboard.add_abbreviation('abc', 'aaa')
     #    self.do(du_a+du_b+du_c+du_space, [])
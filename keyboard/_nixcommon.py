@@ -5,12 +5,17 @@ import atexit
 from time import time as now
 from threading import Thread
 from glob import glob
+from collections import deque
 try:
     from queue import Queue
 except ImportError:
     from Queue import Queue
 
 event_bin_format = 'llHHI'
+# Compiled once, instead of parsing the format for every event read.
+event_struct = struct.Struct(event_bin_format)
+# Events drained per syscall by the device reading threads.
+max_events_per_read = 64
 
 # Taken from include/linux/input.h
 # https://www.kernel.org/doc/Documentation/input/event-codes.txt
@@ -80,18 +85,35 @@ class EventDevice(object):
         return self._output_file
 
     def read_event(self):
-        data = self.input_file.read(struct.calcsize(event_bin_format))
-        seconds, microseconds, type, code, value = struct.unpack(event_bin_format, data)
+        data = self.input_file.read(event_struct.size)
+        seconds, microseconds, type, code, value = event_struct.unpack(data)
         return seconds + microseconds / 1e6, type, code, value, self.path
 
+    def read_events(self):
+        """
+        Blocks until events are available and returns all of them from a single
+        read, skipping the EV_SYN and EV_MSC reports no listener uses. Raises
+        EOFError if the device was closed (e.g. unplugged).
+        """
+        size = event_struct.size
+        data = os.read(self.input_file.fileno(), size * max_events_per_read)
+        if not data:
+            raise EOFError('Device {} was closed.'.format(self.path))
+        events = []
+        for offset in range(0, len(data) - size + 1, size):
+            seconds, microseconds, type, code, value = event_struct.unpack_from(data, offset)
+            if type != EV_SYN and type != EV_MSC:
+                events.append((seconds + microseconds / 1e6, type, code, value, self.path))
+        return events
+
     def write_event(self, type, code, value):
         integer, fraction = divmod(now(), 1)
         seconds = int(integer)
         microseconds = int(fraction * 1e6)
-        data_event = struct.pack(event_bin_format, seconds, microseconds, type, code, value)
+        data_event = event_struct.pack(seconds, microseconds, type, code, value)
 
         # Send a sync event to ensure other programs update.
-        sync_event = struct.pack(event_bin_format, seconds, microseconds, EV_SYN, 0, 0)
+        sync_event = event_struct.pack(seconds, microseconds, EV_SYN, 0, 0)
 
         self.output_file.write(data_event + sync_event)
         self.output_file.flush()
@@ -99,18 +121,31 @@ class EventDevice(object):
 class AggregatedEventDevice(object):
     def __init__(self, devices, output=None):
         self.event_queue = Queue()
+        self.pending_events = deque()
         self.devices = devices
         self.output = output or self.devices[0]
         def start_reading(device):
             while True:
-                self.event_queue.put(device.read_event())
+                try:
+                    events = device.read_events()
+                except EOFError:
+                    # Nothing more will come from this device.
+                    return
+                # Reads of only EV_SYN/EV_MSC reports leave nothing to queue.
+                if events:
+                    self.event_queue.put(events)
+        self.threads = []
         for device in self.devices:
             thread = Thread(target=start_reading, args=[device])
             thread.daemon = True
             thread.start()
+            self.threads.append(thread)
 
     def read_event(self):
-        return self.event_queue.get(block=True)
+        # Events arrive in batches, one per device read.
+        if not self.pending_events:
+            self.pending_events.extend(self.event_queue.get(block=True))
+        return self.pending_events.popleft()
 
     def write_event(self, type, code, value):
         self.output.write_event(type, code, value)